@@ -0,0 +1,49 @@
+"""Допуск запросов и сброс нагрузки."""
+
+import logging
+import threading
+
+
+class AdmissionController:
+    """Допуск запросов по времени ожидания в очереди и числу выполняемых запросов метода.
+
+    max_delay - допустимое время ожидания запроса до начала обработки в секундах,
+    max_in_flight - допустимое число одновременно выполняемых запросов одного метода,
+    limits - допустимое число одновременно выполняемых запросов по имени метода.
+    Запросы неизвестных методов учитываются вместе под методом None.
+    """
+
+    def __init__(self, max_delay=None, max_in_flight=None, limits=None):
+        """Метод init."""
+        self.max_delay = max_delay
+        self.max_in_flight = max_in_flight
+        self.limits = limits or {}
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def limit(self, method):
+        """Допустимое число выполняемых запросов метода."""
+        return self.limits.get(method, self.max_in_flight)
+
+    def in_flight(self, method):
+        """Число выполняемых запросов метода."""
+        return self._in_flight.get(method, 0)
+
+    def admit(self, method, waited):
+        """Допуск запроса метода, ожидавшего обработки waited секунд."""
+        if self.max_delay is not None and waited > self.max_delay:
+            logging.error(f'Запрос "{method}" отклонен: ожидание {waited:.3f} с')
+            return False
+        limit = self.limit(method)
+        with self._lock:
+            in_flight = self._in_flight.get(method, 0)
+            if limit is not None and in_flight >= limit:
+                logging.error(f'Запрос "{method}" отклонен: выполняется {in_flight} запросов')
+                return False
+            self._in_flight[method] = in_flight + 1
+        return True
+
+    def release(self, method):
+        """Завершение допущенного запроса метода."""
+        with self._lock:
+            self._in_flight[method] -= 1
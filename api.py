@@ -4,13 +4,16 @@ import datetime
 import hashlib
 import json
 import logging
+import signal
+import threading
+import time
 import uuid
-from http.server import (
-    BaseHTTPRequestHandler,
-    HTTPServer,
-)
+from http.server import BaseHTTPRequestHandler
 from argparse import ArgumentParser
 
+from admission import AdmissionController
+from capture import TrafficRecorder
+from coalescing import CoalescingStorage
 from constants import (
     ADMIN_SALT,
     BAD_REQUEST,
@@ -21,16 +24,38 @@ from constants import (
     NOT_FOUND,
     OK,
     SALT,
+    SERVICE_UNAVAILABLE,
 )
 from requests import (
     ClientsInterestsRequest,
     MethodRequest,
     OnlineScoreRequest,
+    ProfileRequest,
 )
+from profiler import PROFILER
 from scoring import (
     get_interests,
     get_score,
 )
+from server import make_server
+from snapshots import (
+    SNAPSHOT_TTL,
+    SNAPSHOTS,
+    SnapshotJob,
+    get_snapshot_interests,
+)
+from storage import Storage
+from tracing import (
+    Tracer,
+    span,
+    tag,
+)
+from warmup import start_warmup
+from writebehind import WriteBehindQueue
+
+PROFILE_DUMP = 'profile.prof'
+score_writer = None
+use_snapshots = False
 
 
 def check_auth(request):
@@ -53,7 +78,9 @@ def authorization(func):
     """Авторизация."""
     def wrapper(request, ctx, store):
         response, code = ERRORS.get(FORBIDDEN), FORBIDDEN
-        if check_auth(request):
+        with span('auth'):
+            authorized = check_auth(request)
+        if authorized:
             response, code = func(request, ctx, store)
         return response, code
     return wrapper
@@ -63,7 +90,9 @@ def method_handler(request, ctx, store):
     """Обработка метода."""
     try:
         req = MethodRequest()
-        req.validate(request.get('body'))
+        with span('validation'):
+            req.validate(request.get('body'))
+        tag(account=req.account, method=req.method)
         logging.info(f'Метод запроса: "{req.method}"')
         if req.method == 'online_score':
             response, code = online_score_handler(req, ctx, store)
@@ -75,6 +104,9 @@ def method_handler(request, ctx, store):
         return response, code
     except ValueError:
         return ERRORS.get(INVALID_REQUEST), INVALID_REQUEST
+    except TimeoutError as e:
+        logging.error(e)
+        return ERRORS.get(SERVICE_UNAVAILABLE), SERVICE_UNAVAILABLE
 
 
 @authorization
@@ -82,82 +114,185 @@ def online_score_handler(req, ctx, store):
     """Обработка метода подсчета."""
     arguments = req.arguments
     online_score = OnlineScoreRequest()
-    online_score.validate(arguments)
+    with span('validation'):
+        online_score.validate(arguments)
     ctx['has'] = [key for key, val in arguments.items() if val is not None]
     if req.is_admin:
         score = int(ADMIN_SALT)
     else:
-        score = get_score(
-            store, online_score.phone, online_score.email,
-            online_score.birthday,
-            online_score.gender, online_score.first_name,
-            online_score.last_name,
-        )
+        with span('scoring'):
+            score = get_score(
+                store, online_score.phone, online_score.email,
+                online_score.birthday,
+                online_score.gender, online_score.first_name,
+                online_score.last_name,
+            )
     response = {'score': score}
     logging.info(f'Score: {score}')
+    if score_writer is not None:
+        save_score(score_writer, req.account, arguments, score)
     return response, OK
 
 
+def save_score(writer, account, arguments, score):
+    """Отложенная запись результата подсчета в историю аккаунта."""
+    inputs_hash = hashlib.sha256(json.dumps(arguments, sort_keys=True).encode('utf-8')).hexdigest()
+    record = {'score': score, 'inputs_hash': inputs_hash, 'account': account, 'timestamp': time.time()}
+    writer.put(f'sh:{account or ""}', json.dumps(record))
+
+
 @authorization
 def clients_interests_handler(req, ctx, store):
     """Обработка метода хобби клиентов."""
     clients_interests = ClientsInterestsRequest()
-    clients_interests.validate(req.arguments)
+    with span('validation'):
+        clients_interests.validate(req.arguments)
     ctx['nclients'] = len(clients_interests.client_ids)
-    interests = {_id: get_interests(store, _id) for _id in
-                 clients_interests.client_ids}
+    date = clients_interests.date and datetime.datetime.strptime(clients_interests.date, '%d.%m.%Y').date()
+    with span('scoring', nclients=ctx['nclients']):
+        interests = {_id: get_client_interests(store, _id, date) for _id in
+                     clients_interests.client_ids}
     logging.info(f'Client interest: {interests}')
     return interests, OK
 
 
+def get_client_interests(store, cid, date):
+    """Хобби клиента из снимка на прошедшую дату, если снимки включены и снимок есть, иначе текущие."""
+    if use_snapshots and store is not None and date and date < datetime.date.today():
+        interests = get_snapshot_interests(store, cid, date)
+        if interests is not None:
+            return interests
+    return get_interests(store, cid)
+
+
+def profile_handler(request, ctx, store):
+    """Управление профилированием."""
+    try:
+        req = MethodRequest()
+        req.validate(request.get('body'))
+        logging.info(f'Профилирование: "{req.method}"')
+        return profile_method_handler(req, ctx, store)
+    except ValueError:
+        return ERRORS.get(INVALID_REQUEST), INVALID_REQUEST
+
+
+@authorization
+def profile_method_handler(req, ctx, store):
+    """Обработка метода профилирования."""
+    if not req.is_admin:
+        return ERRORS.get(FORBIDDEN), FORBIDDEN
+    if req.method == 'start':
+        profile = ProfileRequest()
+        profile.validate(req.arguments)
+        PROFILER.rate = 1 if profile.rate is None else profile.rate
+    elif req.method == 'stop':
+        PROFILER.rate = 0
+    elif req.method == 'dump':
+        return {'path': PROFILE_DUMP, 'requests': PROFILER.dump(PROFILE_DUMP)}, OK
+    elif req.method == 'clear':
+        PROFILER.clear()
+    elif req.method != 'report':
+        logging.error('Неизвестный метод')
+        return ERRORS.get(INVALID_REQUEST), INVALID_REQUEST
+    return {'rate': PROFILER.rate, 'report': PROFILER.report()}, OK
+
+
 class MainHTTPHandler(BaseHTTPRequestHandler):
     """HTTP-Сервер."""
 
     router = {
-        "method": method_handler
+        "method": method_handler,
+        "profile": profile_handler,
     }
+    methods = ('online_score', 'clients_interests')
     store = None
+    admission = None
+    recorder = None
+    tracer = None
+    ready = threading.Event()
 
     @staticmethod
     def get_request_id(headers):
-        return headers.get('HTTP_X_REQUEST_ID', uuid.uuid4().hex)
+        return headers.get('X-Request-ID') or uuid.uuid4().hex
+
+    def get_queue_delay(self):
+        """Время ожидания запроса в очереди пула потоков до начала обработки."""
+        queue_delay = getattr(self.server, 'queue_delay', None)
+        return queue_delay(self.request) if queue_delay else 0
+
+    def do_GET(self):
+        """Проверка готовности сервера."""
+        if self.path.strip("/") != "ready":
+            code, r = NOT_FOUND, {"error": ERRORS.get(NOT_FOUND), "code": NOT_FOUND}
+        elif self.ready.is_set():
+            code, r = OK, {"response": {"ready": True}, "code": OK}
+        else:
+            code, r = SERVICE_UNAVAILABLE, {"error": ERRORS.get(SERVICE_UNAVAILABLE), "code": SERVICE_UNAVAILABLE}
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps(r).encode('utf-8'))
 
     def do_POST(self):
+        PROFILER.run(self.process_post, self.get_queue_delay())
+
+    def process_post(self, waited):
+        """Обработка POST запроса."""
+        arrival, started = time.time(), time.monotonic()
         response, code = {}, OK
         context = {"request_id": self.get_request_id(self.headers)}
         logging.info(f'Новый контекст запроса: {context}')
-        request = None
+        trace = self.tracer.start(context['request_id']) if self.tracer else None
         try:
-            data_string = self.rfile.read(int(self.headers['Content-Length']))
-            request = json.loads(data_string)
-            logging.info(f'Получен запрос: {request}')
-        except Exception as e:
-            code = BAD_REQUEST
-            logging.error(e)
-
-        if request:
-            path = self.path.strip("/")
-            if path in self.router:
-                logging.info(f'Путь запроса: {path}')
-                try:
-                    response, code = self.router[path]({"body": request, "headers": self.headers}, context, self.store)
-                except Exception as e:
-                    logging.exception("Ошибка: %s" % e)
-                    code = INTERNAL_ERROR
-            else:
-                logging.error(f'{path} не верный путь запроса')
-                code = NOT_FOUND
+            request, data_string = None, b''
+            try:
+                data_string = self.rfile.read(int(self.headers['Content-Length']))
+                request = json.loads(data_string)
+                logging.info(f'Получен запрос: {request}')
+            except Exception as e:
+                code = BAD_REQUEST
+                logging.error(e)
 
-        self.send_response(code)
-        self.send_header("Content-Type", "application/json")
-        self.end_headers()
-        if code not in ERRORS:
-            r = {"response": response, "code": code}
-        else:
-            r = {"error": response or ERRORS.get(code, "Unknown Error"), "code": code}
-        context.update(r)
-        logging.info(context)
-        self.wfile.write(json.dumps(r).encode('utf-8'))
+            if request:
+                path = self.path.strip("/")
+                method = request.get('method') if isinstance(request, dict) else None
+                if not isinstance(method, str) or method not in self.methods:
+                    method = None
+                admission = self.admission if path != 'profile' else None
+                if path in self.router and admission and not admission.admit(method, waited):
+                    code = SERVICE_UNAVAILABLE
+                elif path in self.router:
+                    logging.info(f'Путь запроса: {path}')
+                    try:
+                        response, code = self.router[path]({"body": request, "headers": self.headers}, context, self.store)
+                    except Exception as e:
+                        logging.exception("Ошибка: %s" % e)
+                        code = INTERNAL_ERROR
+                    finally:
+                        if admission:
+                            admission.release(method)
+                else:
+                    logging.error(f'{path} не верный путь запроса')
+                    code = NOT_FOUND
+
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("X-Request-ID", context['request_id'])
+            if code == SERVICE_UNAVAILABLE:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            if code not in ERRORS:
+                r = {"response": response, "code": code}
+            else:
+                r = {"error": response or ERRORS.get(code, "Unknown Error"), "code": code}
+            context.update(r)
+            logging.info(context)
+            self.wfile.write(json.dumps(r).encode('utf-8'))
+        finally:
+            if trace:
+                self.tracer.finish(trace, code)
+        if self.recorder and self.recorder.sample():
+            self.recorder.record(arrival - waited, self.path, data_string, code, time.monotonic() - started + waited)
         return
 
 
@@ -166,6 +301,34 @@ if __name__ == "__main__":
     parser = ArgumentParser()
     parser.add_argument("-p", "--port", action="store", type=int, default=8080)
     parser.add_argument("-l", "--log", action="store", default=None)
+    parser.add_argument("-s", "--storage", action="store_true", default=False)
+    parser.add_argument("--coalesce-timeout", action="store", type=float, default=1)
+    parser.add_argument("--coalesce-limit", action="append", default=[], metavar="PREFIX=SECONDS")
+    parser.add_argument("--score-history", action="store_true", default=False)
+    parser.add_argument("--history-max-size", action="store", type=int, default=10000)
+    parser.add_argument("--history-batch-size", action="store", type=int, default=100)
+    parser.add_argument("--history-flush-interval", action="store", type=float, default=1)
+    parser.add_argument("--history-policy", action="store", choices=("drop", "block"), default="drop")
+    parser.add_argument("--snapshots", action="store_true", default=False)
+    parser.add_argument("--snapshot-interval", action="store", type=int, default=60)
+    parser.add_argument("--snapshot-ttl-days", action="store", type=int, default=SNAPSHOT_TTL // (24 * 60 * 60))
+    parser.add_argument("--snapshot-cache-ttl", action="store", type=int, default=SNAPSHOTS.ttl)
+    parser.add_argument("--warmup-connections", action="store", type=int, default=10)
+    parser.add_argument("-t", "--threaded", action="store_true", default=False)
+    parser.add_argument("-w", "--workers", action="store", type=int, default=16)
+    parser.add_argument("--queue-size", action="store", type=int, default=128)
+    parser.add_argument("-u", "--unix-socket", action="store", default=None, metavar="PATH")
+    parser.add_argument("--unix-socket-mode", action="store", type=lambda mode: int(mode, 8), default=0o660)
+    parser.add_argument("--max-queue-delay", action="store", type=float, default=None)
+    parser.add_argument("--max-in-flight", action="store", type=int, default=None)
+    parser.add_argument("--method-limit", action="append", default=[], metavar="METHOD=N")
+    parser.add_argument("--profile", action="store", type=float, default=0, metavar="RATE")
+    parser.add_argument("--profile-window", action="store", type=int, default=100)
+    parser.add_argument("--profile-dump", action="store", default=PROFILE_DUMP)
+    parser.add_argument("--capture", action="store", default=None, metavar="PATH")
+    parser.add_argument("--capture-rate", action="store", type=float, default=1)
+    parser.add_argument("--trace", action="store", default=None, metavar="PATH")
+    parser.add_argument("--trace-slow", action="store", type=float, default=0.5)
     args = parser.parse_args()
     logging.basicConfig(
         filename=args.log,
@@ -173,10 +336,64 @@ if __name__ == "__main__":
         format='[%(asctime)s] %(levelname).1s %(message)s',
         datefmt='%Y.%m.%d %H:%M:%S',
     )
-    server = HTTPServer(("localhost", args.port), MainHTTPHandler)
-    logging.info("Старт сервера на %s" % args.port)
+    PROFILER.rate = args.profile
+    PROFILER.resize(args.profile_window)
+    PROFILE_DUMP = args.profile_dump
+    if args.capture:
+        MainHTTPHandler.recorder = TrafficRecorder(args.capture, rate=args.capture_rate)
+    SNAPSHOTS.ttl = args.snapshot_cache_ttl
+    if args.trace:
+        MainHTTPHandler.tracer = Tracer(args.trace, slow=args.trace_slow)
+    snapshot_job = None
+    if args.storage:
+        store = Storage()
+        if args.snapshots:
+            use_snapshots = True
+            snapshot_job = SnapshotJob(
+                store, interval=args.snapshot_interval, ex=args.snapshot_ttl_days * 24 * 60 * 60,
+            ).start()
+        MainHTTPHandler.store = CoalescingStorage(
+            store,
+            timeout=args.coalesce_timeout,
+            wait_limits={prefix: float(limit) for prefix, limit in (item.split('=', 1) for item in args.coalesce_limit)},
+        )
+        if args.score_history:
+            score_writer = WriteBehindQueue(
+                store,
+                max_size=args.history_max_size,
+                batch_size=args.history_batch_size,
+                flush_interval=args.history_flush_interval,
+                policy=args.history_policy,
+            )
+    if args.max_queue_delay is not None or args.max_in_flight is not None or args.method_limit:
+        MainHTTPHandler.admission = AdmissionController(
+            max_delay=args.max_queue_delay,
+            max_in_flight=args.max_in_flight,
+            limits={method: int(limit) for method, limit in (item.split('=', 1) for item in args.method_limit)},
+        )
+    address = args.unix_socket or ("localhost", args.port)
+    server = make_server(
+        address, MainHTTPHandler, threaded=args.threaded, socket_mode=args.unix_socket_mode,
+        workers=args.workers, queue_size=args.queue_size,
+    )
+    logging.info("Старт сервера на %s" % (args.unix_socket or args.port))
+    start_warmup(MainHTTPHandler.ready, MainHTTPHandler.store, args.warmup_connections)
+
+    def stop(signum, frame):
+        """Остановка сервера по сигналу."""
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         pass
     server.server_close()
+    if snapshot_job is not None:
+        snapshot_job.stop()
+    if score_writer is not None:
+        score_writer.close()
+    if MainHTTPHandler.recorder:
+        MainHTTPHandler.recorder.close()
+    if MainHTTPHandler.tracer:
+        MainHTTPHandler.tracer.close()
@@ -0,0 +1,57 @@
+"""Запись трафика для воспроизведения."""
+
+import json
+import random
+import threading
+
+SCRUBBED = '***'
+
+
+def scrub(request, fields=('token',)):
+    """Маскирование секретных полей запроса."""
+    if not isinstance(request, dict):
+        return request
+    return {key: SCRUBBED if key in fields and value else value for key, value in request.items()}
+
+
+class TrafficRecorder:
+    """Запись доли rate запросов в JSONL: тело запроса, время поступления и время обработки."""
+
+    def __init__(self, path, rate=1, fields=('token',)):
+        """Метод init."""
+        self.path = path
+        self.rate = rate
+        self.fields = fields
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def sample(self):
+        """Выбор запроса для записи."""
+        return self.rate >= 1 or random.random() < self.rate
+
+    def record(self, arrival, path, data, code, latency):
+        """Запись запроса, json - тело запроса является JSON, иначе записывается как есть."""
+        try:
+            body, is_json = scrub(json.loads(data), self.fields), True
+        except ValueError:
+            body, is_json = data.decode('utf-8', errors='replace'), False
+        line = json.dumps(
+            {
+                'ts': arrival,
+                'path': path,
+                'body': body,
+                'json': is_json,
+                'size': len(data),
+                'code': code,
+                'latency': latency,
+            },
+            ensure_ascii=False,
+        )
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        """Закрытие файла."""
+        with self._lock:
+            self._file.close()
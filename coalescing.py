@@ -0,0 +1,89 @@
+"""Объединение одинаковых одновременных запросов к хранилищу."""
+
+import logging
+import threading
+
+from tracing import span
+
+
+class Call:
+    """Выполняемый запрос."""
+
+    def __init__(self):
+        """Метод init."""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Одно выполнение функции на ключ для всех одновременных вызовов."""
+
+    def __init__(self):
+        """Метод init."""
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, timeout, func, *args):
+        """Выполнение функции или ожидание результата уже выполняемой, не дольше timeout секунд."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Call()
+        if not leader:
+            with span('storage.wait', key=key):
+                if not call.done.wait(timeout):
+                    raise TimeoutError(f'Превышено время ожидания запроса {key}')
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class CoalescingStorage:
+    """Хранилище, объединяющее одинаковые одновременные чтения.
+
+    wait_limits задает время ожидания по префиксу ключа (часть до ":"),
+    для остальных ключей используется timeout.
+    """
+
+    def __init__(self, store, timeout=1, wait_limits=None):
+        """Метод init."""
+        self._store = store
+        self._flight = SingleFlight()
+        self.timeout = timeout
+        self.wait_limits = wait_limits or {}
+
+    def __getattr__(self, name):
+        """Остальные методы хранилища без изменений."""
+        return getattr(self._store, name)
+
+    def wait_limit(self, key):
+        """Время ожидания для ключа."""
+        return self.wait_limits.get(str(key).split(':', 1)[0], self.timeout)
+
+    def get(self, key):
+        """Получение значения из БД."""
+        return self._flight.do(('get', key), self.wait_limit(key), self._store.get, key)
+
+    def hget(self, name, key):
+        """Получение поля хэша из БД."""
+        return self._flight.do(('hget', name, key), self.wait_limit(name), self._store.hget, name, key)
+
+    def cache_get(self, key):
+        """Получение значения из кэш."""
+        try:
+            return self._flight.do(('cache_get', key), self.wait_limit(key), self._store.cache_get, key)
+        except TimeoutError as e:
+            logging.info(e)
+            return None
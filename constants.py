@@ -9,6 +9,7 @@ FORBIDDEN = 403
 NOT_FOUND = 404
 INVALID_REQUEST = 422
 INTERNAL_ERROR = 500
+SERVICE_UNAVAILABLE = 503
 
 ERRORS = {
     BAD_REQUEST: 'Bad Request',
@@ -16,4 +17,19 @@ ERRORS = {
     NOT_FOUND: 'Not Found',
     INVALID_REQUEST: 'Invalid Request',
     INTERNAL_ERROR: 'Internal Server Error',
+    SERVICE_UNAVAILABLE: 'Service Unavailable',
 }
+
+INTERESTS = (
+    'cars',
+    'pets',
+    'travel',
+    'hi-tech',
+    'sport',
+    'music',
+    'books',
+    'tv',
+    'cinema',
+    'geek',
+    'otus',
+)
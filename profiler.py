@@ -0,0 +1,77 @@
+"""Выборочное профилирование запросов, cProfile и pstats импортируются при первом профилировании."""
+
+import random
+import threading
+from collections import deque
+
+
+class SamplingProfiler:
+    """Профилирование доли запросов со скользящим отчетом по последним window профилям."""
+
+    def __init__(self, rate=0, window=100):
+        """Метод init."""
+        self.rate = rate
+        self._profiles = deque(maxlen=window)
+        self._busy = threading.Lock()
+
+    def run(self, func, *args):
+        """Выполнение функции с профилированием доли rate вызовов."""
+        if self.rate <= 0 or random.random() >= self.rate or not self._busy.acquire(blocking=False):
+            return func(*args)
+        import cProfile
+
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func, *args)
+        finally:
+            self._busy.release()
+            self._profiles.append(profile)
+
+    def resize(self, window):
+        """Изменение числа хранимых профилей."""
+        self._profiles = deque(self._profiles, maxlen=window)
+
+    def clear(self):
+        """Очистка собранных профилей."""
+        self._profiles.clear()
+
+    def stats(self):
+        """Сводная статистика собранных профилей."""
+        import pstats
+
+        profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def report(self, limit=30):
+        """Самые затратные функции по собственному времени выполнения."""
+        import pstats
+
+        stats = self.stats()
+        if stats is None:
+            return []
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+        return [
+            {
+                'function': pstats.func_std_string(func),
+                'calls': calls,
+                'tottime': round(tottime, 6),
+                'cumtime': round(cumtime, 6),
+            }
+            for func, (_, calls, tottime, cumtime, _) in rows
+        ]
+
+    def dump(self, path):
+        """Сохранение сводной статистики в формате pstats."""
+        stats = self.stats()
+        if stats is None:
+            return 0
+        stats.dump_stats(path)
+        return len(self._profiles)
+
+
+PROFILER = SamplingProfiler()
@@ -0,0 +1,166 @@
+"""Воспроизведение записанного трафика и сравнение времени обработки."""
+
+import datetime
+import hashlib
+import json
+import logging
+import socket
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+
+from capture import SCRUBBED
+from constants import (
+    ADMIN_LOGIN,
+    ADMIN_SALT,
+    FORBIDDEN,
+    OK,
+    SALT,
+)
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class UnixHTTPConnection(HTTPConnection):
+    """HTTP-соединение через Unix domain socket."""
+
+    def __init__(self, path, timeout=30):
+        """Метод init."""
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        """Подключение к сокету."""
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+def load(path):
+    """Чтение записей JSONL."""
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def sign(body):
+    """Замена замаскированного токена валидным."""
+    if not isinstance(body, dict) or body.get('token') != SCRUBBED:
+        return body
+    if body.get('login') == ADMIN_LOGIN:
+        msg = datetime.datetime.now().strftime("%Y%m%d%H") + ADMIN_SALT
+    else:
+        msg = (body.get('account') or '') + (body.get('login') or '') + SALT
+    return dict(body, token=hashlib.sha512(msg.encode('utf-8')).hexdigest())
+
+
+def connect(host, port, unix_socket=None):
+    """Соединение с сервером."""
+    return UnixHTTPConnection(unix_socket) if unix_socket else HTTPConnection(host, port, timeout=30)
+
+
+def payload(record, resign):
+    """Тело записанного запроса, запросы с неудачной авторизацией не подписываются."""
+    body = sign(record['body']) if resign and record.get('code') != FORBIDDEN else record['body']
+    return (json.dumps(body) if record.get('json', isinstance(body, dict)) else body).encode('utf-8')
+
+
+def send(host, port, record, resign, unix_socket=None, scheduled=None):
+    """Отправка записанного запроса, время обработки отсчитывается от запланированного времени отправки scheduled."""
+    data = payload(record, resign)
+    started = time.monotonic() if scheduled is None else scheduled
+    connection = connect(host, port, unix_socket)
+    try:
+        connection.request('POST', record['path'], data)
+        response = connection.getresponse()
+        code = json.load(response).get('code', response.status)
+    except Exception as e:
+        logging.error(e)
+        code = None
+    finally:
+        connection.close()
+    return {'ts': record['ts'], 'path': record['path'], 'code': code, 'latency': time.monotonic() - started}
+
+
+def replay(records, host, port, speed=1, resign=False, workers=32, unix_socket=None):
+    """Воспроизведение записей с исходными интервалами между запросами, ускоренными в speed раз.
+
+    Время обработки включает ожидание свободного потока, чтобы задержки отправки не скрывали медленные ответы.
+    """
+    if not records:
+        return []
+    records = sorted(records, key=lambda record: record['ts'])
+    first, start = records[0]['ts'], time.monotonic()
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for record in records:
+            scheduled = start + (record['ts'] - first) / speed
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(executor.submit(send, host, port, record, resign, unix_socket, scheduled))
+    return [future.result() for future in futures]
+
+
+def percentile(values, percent):
+    """Перцентиль значений."""
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def summary(records):
+    """Распределение времени обработки и доля ошибок."""
+    latencies = [record['latency'] for record in records]
+    errors = sum(1 for record in records if record.get('code') != OK)
+    result = {f'p{percent}': percentile(latencies, percent) for percent in PERCENTILES}
+    result.update(
+        {
+            'count': len(records),
+            'max': max(latencies, default=None),
+            'errors': errors / len(records) if records else 0,
+        }
+    )
+    return result
+
+
+def compare(base, new):
+    """Сравнение распределений времени обработки двух запусков."""
+    base, new = summary(base), summary(new)
+    return {
+        key: {
+            'base': base[key],
+            'new': new[key],
+            'change': new[key] / base[key] - 1 if base[key] and new[key] is not None else None,
+        }
+        for key in base
+    }
+
+
+if __name__ == "__main__":
+    """Запуск воспроизведения."""
+    parser = ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("capture")
+    run_parser.add_argument("-o", "--output", action="store", required=True)
+    run_parser.add_argument("--host", action="store", default="localhost")
+    run_parser.add_argument("-p", "--port", action="store", type=int, default=8080)
+    run_parser.add_argument("-u", "--unix-socket", action="store", default=None, metavar="PATH")
+    run_parser.add_argument("--speed", action="store", type=float, default=1)
+    run_parser.add_argument("--workers", action="store", type=int, default=32)
+    run_parser.add_argument("--resign", action="store_true", default=False)
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    args = parser.parse_args()
+    if args.command == "run":
+        results = replay(
+            load(args.capture), args.host, args.port, args.speed, args.resign, args.workers, args.unix_socket,
+        )
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.writelines(json.dumps(result) + '\n' for result in results)
+        print(json.dumps(summary(results), indent=2))
+    else:
+        print(json.dumps(compare(load(args.base), load(args.new)), indent=2))
@@ -13,6 +13,7 @@ from validation import (
     Field,
     GenderField,
     PhoneField,
+    RateField,
 )
 
 
@@ -21,7 +22,14 @@ class ApiRequest:
 
     def __init__(self):
         """Метод init."""
-        self.fields = [field for field, value in self.__class__.__dict__.items() if isinstance(value, Field)]
+        self.fields = self.schema()
+
+    @classmethod
+    def schema(cls):
+        """Поля запроса, определяются один раз для класса."""
+        if '_fields' not in cls.__dict__:
+            cls._fields = [field for field, value in cls.__dict__.items() if isinstance(value, Field)]
+        return cls._fields
 
     def validate(self, kwargs):
         """Валидация запроса."""
@@ -69,6 +77,12 @@ class OnlineScoreRequest(ApiRequest):
             raise ValueError('Ошибка валидации полей')
 
 
+class ProfileRequest(ApiRequest):
+    """Валидация запроса профилирования."""
+
+    rate = RateField(required=False, nullable=True)
+
+
 class MethodRequest(ApiRequest):
     """Валидация метода запроса."""
 
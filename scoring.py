@@ -1,6 +1,67 @@
 """Получение результатов расчета."""
 
 import random
+import sys
+
+from constants import INTERESTS
+
+
+class InterestsCatalog:
+    """Справочник хобби для кодирования хобби клиентов битовой маской.
+
+    Бит N-1 маски соответствует ключу справочника `i:N` в БД.
+    """
+
+    def __init__(self, interests=INTERESTS):
+        """Метод init."""
+        self.loaded = False
+        self._set(interests)
+
+    def _set(self, interests):
+        """Установка справочника."""
+        self.interests = tuple(sys.intern(interest) for interest in interests)
+        self._index = {interest: number for number, interest in enumerate(self.interests)}
+        self._decoded = {}
+
+    def load(self, store):
+        """Загрузка справочника `i:N` из БД в память процесса."""
+        interests = []
+        while True:
+            interest = store.get(f'i:{len(interests) + 1}')
+            if interest is None:
+                break
+            interests.append(interest)
+        if interests:
+            self._set(interests)
+        self.loaded = True
+        return self
+
+    def encode(self, interests):
+        """Кодирование списка хобби в битовую маску."""
+        mask = 0
+        for interest in interests:
+            if interest not in self._index:
+                raise ValueError(f'Неизвестное хобби "{interest}"')
+            mask |= 1 << self._index[interest]
+        return mask
+
+    def decode(self, mask):
+        """Декодирование битовой маски в список хобби."""
+        decoded = self._decoded.get(mask)
+        if decoded is None:
+            decoded = tuple(interest for number, interest in enumerate(self.interests) if mask >> number & 1)
+            self._decoded[mask] = decoded
+        return list(decoded)
+
+
+CATALOG = InterestsCatalog()
+
+
+def get_catalog(store):
+    """Получение справочника хобби, загруженного из БД."""
+    if not CATALOG.loaded:
+        CATALOG.load(store)
+    return CATALOG
 
 
 def get_score(store, phone, email, birthday=None, gender=None, first_name=None, last_name=None):
@@ -19,5 +80,12 @@ def get_score(store, phone, email, birthday=None, gender=None, first_name=None,
 
 def get_interests(store, cid):
     """Получение хобби."""
-    interests = ['cars', 'pets', 'travel', 'hi-tech', 'sport', 'music', 'books', 'tv', 'cinema', 'geek', 'otus']
-    return random.sample(interests, 2)
+    if store is None:
+        return random.sample(INTERESTS, 2)
+    mask = store.get(f'ci:{cid}')
+    return get_catalog(store).decode(int(mask)) if mask else []
+
+
+def set_interests(store, cid, interests):
+    """Запись хобби клиента в БД битовой маской."""
+    return store.set(f'ci:{cid}', get_catalog(store).encode(interests))
@@ -0,0 +1,162 @@
+"""HTTP-серверы."""
+
+import logging
+import os
+import queue
+import socket
+import stat
+import threading
+import time
+from http.server import HTTPServer
+
+
+class WorkerPoolMixIn:
+    """Обработка соединений пулом из workers потоков.
+
+    Принятые соединения ожидают свободный поток в очереди из queue_size соединений,
+    время ожидания в очереди доступно обработчику через queue_delay.
+    При заполнении очереди новые соединения ожидают в очереди сокета.
+    """
+
+    workers = 16
+    queue_size = 128
+
+    def __init__(self, *args, **kwargs):
+        """Метод init."""
+        self.queue_delays = {}
+        self._queue = None
+        self._threads = []
+        super().__init__(*args, **kwargs)
+
+    def process_request(self, request, client_address):
+        """Передача соединения в очередь пула."""
+        if self._queue is None:
+            self._start_workers()
+        self._queue.put((request, client_address, time.monotonic()))
+
+    def queue_delay(self, request):
+        """Время ожидания соединения в очереди пула."""
+        return self.queue_delays.pop(request, 0)
+
+    def shutdown_request(self, request):
+        """Закрытие соединения."""
+        self.queue_delays.pop(request, None)
+        super().shutdown_request(request)
+
+    def server_close(self):
+        """Закрытие сервера после обработки принятых соединений."""
+        super().server_close()
+        if self._queue is not None:
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+
+    def _start_workers(self):
+        """Запуск потоков пула."""
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._threads = [
+            threading.Thread(target=self._work, name=f'worker-{number}') for number in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self):
+        """Обработка соединений из очереди."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            request, client_address, accepted = item
+            self.queue_delays[request] = time.monotonic() - accepted
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+
+class UnixSocketMixIn:
+    """Прослушивание Unix domain socket вместо TCP."""
+
+    address_family = socket.AF_UNIX
+    socket_mode = 0o660
+
+    def server_bind(self):
+        """Привязка к файлу сокета."""
+        remove_stale_socket(self.server_address)
+        super(HTTPServer, self).server_bind()
+        os.chmod(self.server_address, self.socket_mode)
+        self.server_name = self.server_address
+        self.server_port = 0
+
+    def get_request(self):
+        """Принятие соединения."""
+        request, _ = super().get_request()
+        return request, (self.server_address, 0)
+
+    def server_close(self):
+        """Закрытие сервера и удаление файла сокета."""
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+def remove_stale_socket(path):
+    """Удаление файла сокета, оставшегося от остановленного сервера."""
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f'{path} не является сокетом')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            logging.info(f'Удаление старого сокета {path}')
+            os.unlink(path)
+            return
+    raise OSError(f'Сокет {path} уже используется')
+
+
+class ApiHTTPServer(HTTPServer):
+    """Однопоточный HTTP-сервер."""
+
+
+class ThreadingApiHTTPServer(WorkerPoolMixIn, HTTPServer):
+    """Многопоточный HTTP-сервер с пулом потоков, при закрытии ожидает выполняемые запросы."""
+
+
+class UnixApiHTTPServer(UnixSocketMixIn, ApiHTTPServer):
+    """Однопоточный HTTP-сервер на Unix domain socket."""
+
+
+class ThreadingUnixApiHTTPServer(UnixSocketMixIn, ThreadingApiHTTPServer):
+    """Многопоточный HTTP-сервер на Unix domain socket."""
+
+
+def make_server(
+    address, handler, threaded=False, socket_mode=UnixSocketMixIn.socket_mode,
+    workers=WorkerPoolMixIn.workers, queue_size=WorkerPoolMixIn.queue_size,
+):
+    """Создание HTTP-сервера, address - пара (хост, порт) или путь к Unix domain socket."""
+    if isinstance(address, str):
+        server_class = ThreadingUnixApiHTTPServer if threaded else UnixApiHTTPServer
+        server = server_class(address, handler, bind_and_activate=False)
+        server.socket_mode = socket_mode
+        try:
+            server.server_bind()
+            server.server_activate()
+        except Exception:
+            server.socket.close()
+            raise
+    else:
+        server_class = ThreadingApiHTTPServer if threaded else ApiHTTPServer
+        server = server_class(address, handler)
+    if threaded:
+        server.workers, server.queue_size = workers, queue_size
+    return server
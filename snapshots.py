@@ -0,0 +1,142 @@
+"""Снимки хобби клиентов по датам."""
+
+import datetime
+import logging
+import threading
+import time
+from argparse import ArgumentParser
+from collections import OrderedDict
+
+from scoring import get_catalog
+from storage import Storage
+
+SNAPSHOT_TTL = 90 * 24 * 60 * 60
+CACHE_TTL = 24 * 60 * 60
+MISSING_TTL = 60
+
+
+def snapshot_key(date):
+    """Ключ снимка на дату."""
+    return f'snap:{date:%Y%m%d}'
+
+
+def build_snapshot(store, date, ex=SNAPSHOT_TTL, today=None):
+    """Создание или обновление снимка хобби всех клиентов со временем жизни ex секунд.
+
+    Снимок копирует текущие данные, поэтому создается только на текущий день,
+    последнее обновление до полуночи становится снимком дня.
+    """
+    today = today or datetime.date.today()
+    if date != today:
+        raise ValueError(f'Снимок на {date:%d.%m.%Y} можно создать только в течение этого дня')
+    interests = store.scan_values('ci:*')
+    mapping = {key.split(':', 1)[1]: mask for key, mask in interests.items() if mask is not None}
+    store.save_snapshot(snapshot_key(date), mapping, ex)
+    logging.info(f'Обновлен снимок хобби на {date:%d.%m.%Y}: {len(mapping)} клиентов')
+    return len(mapping)
+
+
+class SnapshotCache:
+    """Кэш хобби клиентов из снимков в памяти процесса."""
+
+    def __init__(self, ttl=CACHE_TTL, max_size=100000):
+        """Метод init."""
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key):
+        """Получение значения из кэш."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Запись значения в кэш."""
+        with self._lock:
+            self._items[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+SNAPSHOTS = SnapshotCache()
+
+
+def snapshot_exists(store, date):
+    """Проверка наличия снимка на дату, отсутствие снимка кэшируется на MISSING_TTL секунд."""
+    exists = SNAPSHOTS.get(date)
+    if exists is None:
+        exists = store.exists(snapshot_key(date))
+        SNAPSHOTS.set(date, exists, None if exists else MISSING_TTL)
+        if not exists:
+            logging.error(f'Нет снимка хобби на {date:%d.%m.%Y}')
+    return exists
+
+
+def get_snapshot_interests(store, cid, date):
+    """Получение хобби клиента из снимка на дату, None если снимка нет."""
+    interests = SNAPSHOTS.get((date, cid))
+    if interests is None:
+        if not snapshot_exists(store, date):
+            return None
+        mask = store.hget(snapshot_key(date), cid)
+        interests = tuple(get_catalog(store).decode(int(mask))) if mask else ()
+        SNAPSHOTS.set((date, cid), interests)
+    return list(interests)
+
+
+class SnapshotJob:
+    """Фоновое обновление снимка на текущий день раз в interval секунд одним из процессов сервера."""
+
+    def __init__(self, store, interval=60, ex=SNAPSHOT_TTL):
+        """Метод init."""
+        self._store = store
+        self.interval = interval
+        self.ex = ex
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='snapshots', daemon=True)
+
+    def start(self):
+        """Запуск."""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Остановка."""
+        self._stopped.set()
+        self._thread.join()
+
+    def run_once(self, now=None):
+        """Обновление снимка на сегодня, если его не обновил другой процесс в течение interval секунд."""
+        date = (now or datetime.datetime.now()).date()
+        if not self._store.lock(f'lock:{snapshot_key(date)}', max(1, int(self.interval))):
+            return False
+        build_snapshot(self._store, date, self.ex, date)
+        return True
+
+    def _run(self):
+        """Фоновое создание снимков."""
+        while not self._stopped.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logging.error(f'Не удалось обновить снимок хобби: {e}')
+            self._stopped.wait(self.interval)
+
+
+if __name__ == "__main__":
+    """Обновление снимка на сегодня, запуск из cron в течение дня и последний раз перед полуночью (например, в 23:59)."""
+    parser = ArgumentParser()
+    parser.add_argument("--ttl-days", action="store", type=int, default=SNAPSHOT_TTL // (24 * 60 * 60))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname).1s %(message)s')
+    build_snapshot(Storage(), datetime.date.today(), args.ttl_days * 24 * 60 * 60)
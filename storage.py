@@ -2,12 +2,16 @@
 
 import configparser
 import logging
+import threading
+from functools import lru_cache
 from pathlib import Path
 from time import sleep
 
-import redis
+from constants import INTERESTS
+from tracing import traced
 
 
+@lru_cache(maxsize=None)
 def config():
     """Получение данных из файла настроек хранилища"""
     parser = configparser.ConfigParser()
@@ -38,28 +42,107 @@ def retry(count=3, interval=1):
     return my_decorator
 
 
-HOST, PORT, SOCKET_TIMEOUT = config()
-
-
 class Storage:
-    """Хранилище данных Redis."""
-    def __init__(self, host=HOST, port=PORT, socket_timeout=SOCKET_TIMEOUT):
-        self._r = redis.Redis(host=host, port=port, socket_timeout=socket_timeout, decode_responses=True)
+    """Хранилище данных Redis, настройки и клиент Redis загружаются при первом обращении."""
+    def __init__(self, host=None, port=None, socket_timeout=None):
+        self._settings = (host, port, socket_timeout)
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def _r(self):
+        """Клиент Redis, создается один раз и для прогрева, и для первого запроса."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import redis
+
+                    host, port, socket_timeout = (
+                        value if value is not None else default for value, default in zip(self._settings, config())
+                    )
+                    self._client = redis.Redis(
+                        host=host, port=port, socket_timeout=socket_timeout, decode_responses=True,
+                    )
+        return self._client
+
+    def connect(self, count=1):
+        """Открытие count соединений пула."""
+        pool = self._r.connection_pool
+        connections = [pool.get_connection('PING') for _ in range(count)]
+        for connection in connections:
+            pool.release(connection)
+        return len(connections)
 
     def ping(self):
         """Пинг."""
         return self._r.ping()
 
+    @traced('storage.get')
     @retry()
     def get(self, key):
         """Получение значения из БД."""
         return self._r.get(key)
 
+    @traced('storage.set')
     @retry()
     def set(self, name, value, ex=None):
         """Запись значения в БД."""
         return self._r.set(name, value, ex)
 
+    @traced('storage.lock')
+    @retry()
+    def lock(self, name, ex):
+        """Захват блокировки на ex секунд, False если она уже захвачена."""
+        return bool(self._r.set(name, 1, nx=True, ex=ex))
+
+    @traced('storage.exists')
+    @retry()
+    def exists(self, name):
+        """Проверка наличия ключа в БД."""
+        return bool(self._r.exists(name))
+
+    @traced('storage.hget')
+    @retry()
+    def hget(self, name, key):
+        """Получение поля хэша из БД."""
+        return self._r.hget(name, key)
+
+    @traced('storage.scan_values')
+    @retry()
+    def scan_values(self, match, count=1000):
+        """Получение значений всех ключей по шаблону."""
+        values = {}
+        keys = []
+        for key in self._r.scan_iter(match=match, count=count):
+            keys.append(key)
+            if len(keys) == count:
+                values.update(zip(keys, self._r.mget(keys)))
+                keys = []
+        if keys:
+            values.update(zip(keys, self._r.mget(keys)))
+        return values
+
+    @traced('storage.save_snapshot')
+    @retry()
+    def save_snapshot(self, name, mapping, ex):
+        """Атомарная запись хэша со временем жизни ex секунд."""
+        pipeline = self._r.pipeline(transaction=True)
+        pipeline.delete(name)
+        if mapping:
+            pipeline.hset(name, mapping=mapping)
+        pipeline.expire(name, ex)
+        return pipeline.execute()
+
+    @traced('storage.push_many')
+    def push_many(self, items):
+        """Добавление пар (имя списка, значение) в списки БД одной транзакцией."""
+        # Без @retry: повтор после потерянного ответа на выполненную транзакцию продублировал бы записи.
+        pipeline = self._r.pipeline(transaction=True)
+        for name, value in items:
+            pipeline.rpush(name, value)
+        return pipeline.execute()
+
+    @traced('storage.cache_get')
     def cache_get(self, key):
         """Получение значения из кэш."""
         try:
@@ -69,6 +152,7 @@ class Storage:
             logging.info(e)
             return None
 
+    @traced('storage.cache_set')
     def cache_set(self, name, value, ex=None):
         """Запись значения в кэш."""
         try:
@@ -79,20 +163,7 @@ class Storage:
 
     def create_interests(self):
         """Создание хобби в БД."""
-        interests = [
-            'cars',
-            'pets',
-            'travel',
-            'hi-tech',
-            'sport',
-            'music',
-            'books',
-            'tv',
-            'cinema',
-            'geek',
-            'otus',
-        ]
-        for number, interest in enumerate(interests, 1):
+        for number, interest in enumerate(INTERESTS, 1):
             self.set(f'i:{number}', interest)
 
     def disconnect(self):
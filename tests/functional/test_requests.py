@@ -9,8 +9,12 @@ from threading import Thread
 
 import pytest
 
+import api
 import constants
+from admission import AdmissionController
 from api import MainHTTPHandler
+from profiler import PROFILER
+from warmup import start_warmup
 
 HOST = "localhost"
 PORT = 8080
@@ -35,9 +39,9 @@ def client_connection():
     connection.close()
 
 
-def create_request(client_connection, request):
+def create_request(client_connection, request, path='/method/'):
     """Создание POST запроса."""
-    client_connection.request('POST', '/method/', json.dumps(request))
+    client_connection.request('POST', path, json.dumps(request))
     req = client_connection.getresponse()
     return json.load(req)
 
@@ -190,3 +194,104 @@ class TestRequests:
         request = {'account': 'c3po', 'login': 'c3po_login', 'method': 'online_score', 'arguments': args}
         response = create_request(client_connection, set_valid_auth(request))
         assert response.get("code") == constants.OK
+
+    def test_overload_request(self, client_connection):
+        """Отклонение запроса при перегрузке."""
+        MainHTTPHandler.admission = AdmissionController(limits={'online_score': 0})
+        try:
+            arguments = {'phone': '79999999999', 'email': 'grun_gespenst@tut.by'}
+            request = {'account': 'c3po', 'login': 'c3po_login', 'method': 'online_score', 'arguments': arguments}
+            response = create_request(client_connection, set_valid_auth(request))
+        finally:
+            MainHTTPHandler.admission = None
+        assert response.get('code') == constants.SERVICE_UNAVAILABLE
+
+    @pytest.mark.parametrize('method', [['online_score'], {'a': 1}, 'r2d2'], ids=['list', 'dict', 'unknown'])
+    def test_overload_invalid_method(self, method, client_connection):
+        """Некорректный метод при ограничении нагрузки."""
+        admission = AdmissionController(max_in_flight=1)
+        MainHTTPHandler.admission = admission
+        try:
+            request = {'account': 'c3po', 'login': 'c3po_login', 'method': method, 'arguments': {}}
+            response = create_request(client_connection, set_valid_auth(request))
+        finally:
+            MainHTTPHandler.admission = None
+        assert response.get('code') == constants.INVALID_REQUEST
+        assert admission.in_flight(None) == 0
+
+    def test_storage_wait_timeout(self, client_connection, monkeypatch):
+        """Превышение времени ожидания объединенного чтения из хранилища."""
+        class Store:
+            def get(self, key):
+                raise TimeoutError(f'Превышено время ожидания запроса {key}')
+
+        monkeypatch.setattr(MainHTTPHandler, 'store', Store())
+        request = {'account': 'c3po', 'login': 'c3po_login', 'method': 'clients_interests', 'arguments': {'client_ids': [1]}}
+        response = create_request(client_connection, set_valid_auth(request))
+        assert response.get('code') == constants.SERVICE_UNAVAILABLE
+
+    @pytest.fixture
+    def profiler(self):
+        """Сброс профилирования после теста."""
+        yield PROFILER
+        PROFILER.rate = 0
+        PROFILER.clear()
+
+    def test_profile_forbidden(self, profiler, client_connection):
+        """Управление профилированием не под пользователем Админ."""
+        request = {'account': 'c3po', 'login': 'c3po_login', 'method': 'start', 'arguments': {'rate': 1}}
+        response = create_request(client_connection, set_valid_auth(request), path='/profile/')
+        assert response.get('code') == constants.FORBIDDEN
+        assert profiler.rate == 0
+
+    def test_profile_overload(self, profiler, client_connection):
+        """Управление профилированием не ограничивается при перегрузке."""
+        MainHTTPHandler.admission = AdmissionController(max_in_flight=0)
+        try:
+            request = {'account': 'c3po', 'login': 'admin', 'method': 'stop', 'arguments': {}}
+            response = create_request(client_connection, set_valid_auth(request), path='/profile/')
+        finally:
+            MainHTTPHandler.admission = None
+        assert response.get('code') == constants.OK
+
+    def test_profile_request(self, profiler, client_connection):
+        """Управление профилированием."""
+        request = {'account': 'c3po', 'login': 'admin', 'method': 'start', 'arguments': {'rate': 1}}
+        response = create_request(client_connection, set_valid_auth(request), path='/profile/')
+        assert response.get('code') == constants.OK
+        arguments = {'phone': '79999999999', 'email': 'grun_gespenst@tut.by'}
+        request = {'account': 'c3po', 'login': 'c3po_login', 'method': 'online_score', 'arguments': arguments}
+        assert create_request(client_connection, set_valid_auth(request)).get('code') == constants.OK
+        request = {'account': 'c3po', 'login': 'admin', 'method': 'stop', 'arguments': {}}
+        response = create_request(client_connection, set_valid_auth(request), path='/profile/')
+        assert response.get('code') == constants.OK
+        assert response['response']['rate'] == 0
+        assert any('process_post' in row['function'] for row in response['response']['report'])
+
+    def test_score_history(self, client_connection, monkeypatch):
+        """Запись результата подсчета в историю."""
+        records = []
+        monkeypatch.setattr(api, 'score_writer', type('Writer', (), {'put': lambda self, *item: records.append(item)})())
+        arguments = {'phone': '79999999999', 'email': 'grun_gespenst@tut.by'}
+        request = {'account': 'c3po', 'login': 'c3po_login', 'method': 'online_score', 'arguments': arguments}
+        response = create_request(client_connection, set_valid_auth(request))
+        assert response.get('code') == constants.OK
+        (name, value), = records
+        assert name == 'sh:c3po'
+        assert json.loads(value)['score'] == response['response']['score']
+
+    def test_request_id(self, client_connection):
+        """Передача идентификатора запроса."""
+        client_connection.request('POST', '/method/', json.dumps({'login': 'c3po'}), {'X-Request-ID': 'r2d2'})
+        response = client_connection.getresponse()
+        response.read()
+        assert response.getheader('X-Request-ID') == 'r2d2'
+
+    def test_ready(self, client_connection):
+        """Готовность сервера после прогрева."""
+        MainHTTPHandler.ready.clear()
+        client_connection.request('GET', '/ready')
+        assert json.load(client_connection.getresponse()).get('code') == constants.SERVICE_UNAVAILABLE
+        start_warmup(MainHTTPHandler.ready).join()
+        client_connection.request('GET', '/ready')
+        assert json.load(client_connection.getresponse()).get('code') == constants.OK
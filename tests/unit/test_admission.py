@@ -0,0 +1,31 @@
+"""Unit tests."""
+
+import pytest
+
+from admission import AdmissionController
+
+
+class TestAdmissionController:
+    """Unit tests для AdmissionController."""
+
+    def test_admit(self):
+        """Допуск без ограничений."""
+        admission = AdmissionController()
+        assert admission.admit('online_score', 10)
+        assert admission.in_flight('online_score') == 1
+        admission.release('online_score')
+        assert admission.in_flight('online_score') == 0
+
+    @pytest.mark.parametrize('waited, admitted', ((0.01, True), (0.5, False)), ids=['fast', 'slow'])
+    def test_queue_delay(self, waited, admitted):
+        """Ограничение времени ожидания."""
+        assert AdmissionController(max_delay=0.1).admit('online_score', waited) is admitted
+
+    def test_method_limit(self):
+        """Ограничение выполняемых запросов не влияет на другие методы."""
+        admission = AdmissionController(max_in_flight=5, limits={'clients_interests': 1})
+        assert admission.admit('clients_interests', 0)
+        assert not admission.admit('clients_interests', 0)
+        assert admission.admit('online_score', 0)
+        admission.release('clients_interests')
+        assert admission.admit('clients_interests', 0)
@@ -0,0 +1,84 @@
+"""Unit tests."""
+
+import json
+
+import pytest
+
+import replay
+from capture import (
+    SCRUBBED,
+    TrafficRecorder,
+)
+from replay import (
+    compare,
+    load,
+    payload,
+    percentile,
+    sign,
+)
+
+
+class TestTrafficRecorder:
+    """Unit tests для TrafficRecorder."""
+
+    def test_record(self, tmp_path):
+        """Запись запроса с маскированием токена."""
+        path = str(tmp_path / 'capture.jsonl')
+        recorder = TrafficRecorder(path)
+        data = json.dumps({'login': 'c3po', 'token': 'secret', 'method': 'online_score'}).encode('utf-8')
+        recorder.record(1.5, '/method/', data, 200, 0.01)
+        recorder.record(2.5, '/method/', b'{bad', 400, 0.02)
+        recorder.record(3.5, '/method/', b'"x"', 422, 0.03)
+        recorder.close()
+        first, second, third = load(path)
+        assert first['body'] == {'login': 'c3po', 'token': SCRUBBED, 'method': 'online_score'}
+        assert first['ts'] == 1.5 and first['size'] == len(data) and first['json']
+        assert second['body'] == '{bad' and second['code'] == 400 and not second['json']
+        assert third['body'] == 'x' and third['json']
+
+    @pytest.mark.parametrize('rate, sampled', ((1, True), (0, False)), ids=['all', 'none'])
+    def test_sample(self, rate, sampled, tmp_path):
+        """Выбор запросов для записи."""
+        recorder = TrafficRecorder(str(tmp_path / 'capture.jsonl'), rate=rate)
+        assert recorder.sample() is sampled
+        recorder.close()
+
+
+class TestReplay:
+    """Unit tests для воспроизведения."""
+
+    def test_sign(self):
+        """Замена замаскированного токена."""
+        assert sign({'account': 'c3po', 'login': 'c3po', 'token': SCRUBBED})['token'] != SCRUBBED
+        assert sign({'login': 'c3po', 'token': 'aeaed'})['token'] == 'aeaed'
+
+    @pytest.mark.parametrize(
+        'body, is_json, data',
+        (([1, 2], True, b'[1, 2]'), (7, True, b'7'), ('x', True, b'"x"'), ('{bad', False, b'{bad')),
+        ids=['list', 'int', 'string', 'raw'],
+    )
+    def test_payload(self, body, is_json, data):
+        """Тело воспроизводимого запроса."""
+        assert payload({'body': body, 'json': is_json}, resign=True) == data
+
+    def test_percentile(self):
+        """Перцентили."""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 51
+        assert percentile(values, 99.9) == 100
+        assert percentile([], 50) is None
+
+    def test_compare(self):
+        """Сравнение запусков."""
+        base = [{'latency': 0.1, 'code': 200}] * 10
+        new = [{'latency': 0.2, 'code': 200}] * 9 + [{'latency': 0.2, 'code': 500}]
+        result = compare(base, new)
+        assert result['p50']['change'] == pytest.approx(1)
+        assert result['errors'] == {'base': 0, 'new': 0.1, 'change': None}
+
+    def test_replay_scheduled(self, monkeypatch):
+        """Время обработки от запланированного времени отправки."""
+        monkeypatch.setattr(replay, 'send', lambda *args: {'scheduled': args[-1]})
+        records = [{'ts': 10.0}, {'ts': 12.0}, {'ts': 11.0}]
+        results = replay.replay(records, 'localhost', 8080, speed=100, workers=1)
+        assert [result['scheduled'] - results[0]['scheduled'] for result in results] == pytest.approx([0, 0.01, 0.02])
@@ -0,0 +1,121 @@
+"""Unit tests."""
+
+import threading
+import time
+
+import pytest
+
+from coalescing import (
+    CoalescingStorage,
+    SingleFlight,
+)
+from tracing import Tracer
+
+
+class SlowStore:
+    """Медленное хранилище с подсчетом обращений."""
+
+    def __init__(self, delay=0.1):
+        """Метод init."""
+        self.delay = delay
+        self.calls = 0
+
+    def get(self, key):
+        """Получение значения."""
+        self.calls += 1
+        time.sleep(self.delay)
+        return f'value:{key}'
+
+    cache_get = get
+
+    def ping(self):
+        """Пинг."""
+        return True
+
+
+def run_concurrently(func, count=10):
+    """Одновременный вызов функции в потоках."""
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(func())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight:
+    """Unit tests для SingleFlight."""
+
+    def test_coalesce(self):
+        """Одинаковые одновременные запросы выполняются один раз."""
+        store = SlowStore()
+        storage = CoalescingStorage(store)
+        results = run_concurrently(lambda: storage.get('ci:1'))
+        assert results == ['value:ci:1'] * 10
+        assert store.calls == 1
+
+    def test_different_keys(self):
+        """Разные ключи не объединяются."""
+        store = SlowStore(delay=0)
+        storage = CoalescingStorage(store)
+        assert storage.get('ci:1') != storage.get('ci:2')
+        assert store.calls == 2
+
+    def test_error(self):
+        """Ошибка передается всем ожидающим."""
+        def fail():
+            time.sleep(0.1)
+            raise ConnectionError('redis')
+
+        flight = SingleFlight()
+        errors = []
+
+        def call():
+            try:
+                flight.do('key', 1, fail)
+            except ConnectionError as e:
+                errors.append(e)
+
+        run_concurrently(call, count=3)
+        assert len(errors) == 3
+
+    def test_wait_limit(self):
+        """Превышение времени ожидания для префикса ключа."""
+        storage = CoalescingStorage(SlowStore(delay=0.3), wait_limits={'ci': 0.05})
+        thread = threading.Thread(target=storage.get, args=('ci:1',))
+        thread.start()
+        time.sleep(0.05)
+        with pytest.raises(TimeoutError):
+            storage.get('ci:1')
+        thread.join()
+
+    def test_cache_get_wait_limit(self):
+        """Превышение времени ожидания кэша - промах кэша."""
+        storage = CoalescingStorage(SlowStore(delay=0.3), timeout=0.05)
+        thread = threading.Thread(target=storage.cache_get, args=('score',))
+        thread.start()
+        time.sleep(0.05)
+        assert storage.cache_get('score') is None
+        thread.join()
+
+    def test_delegate(self):
+        """Остальные методы хранилища."""
+        assert CoalescingStorage(SlowStore()).ping()
+
+    def test_wait_span(self, tmp_path):
+        """Ожидание выполняемого запроса попадает в трассу ожидающего."""
+        storage = CoalescingStorage(SlowStore(delay=0.2))
+        thread = threading.Thread(target=storage.get, args=('ci:1',))
+        thread.start()
+        time.sleep(0.05)
+        tracer = Tracer(str(tmp_path / 'trace.jsonl'), slow=0)
+        trace = tracer.start('r2d2')
+        assert storage.get('ci:1') == 'value:ci:1'
+        tracer.finish(trace, 200)
+        tracer.close()
+        thread.join()
+        wait, = trace.spans
+        assert wait['name'] == 'storage.wait'
+        assert wait['key'] == ('get', 'ci:1')
+        assert wait['duration'] > 0.1
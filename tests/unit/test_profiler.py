@@ -0,0 +1,43 @@
+"""Unit tests."""
+
+import pstats
+
+from profiler import SamplingProfiler
+
+
+def work():
+    """Профилируемая функция."""
+    return sum(range(1000))
+
+
+class TestSamplingProfiler:
+    """Unit tests для SamplingProfiler."""
+
+    def test_disabled(self):
+        """Профилирование выключено."""
+        profiler = SamplingProfiler()
+        assert profiler.run(work) == 499500
+        assert profiler.report() == []
+
+    def test_report(self):
+        """Отчет по профилированным вызовам."""
+        profiler = SamplingProfiler(rate=1)
+        for _ in range(3):
+            profiler.run(work)
+        report = profiler.report()
+        assert any('work' in row['function'] and row['calls'] == 3 for row in report)
+
+    def test_window(self):
+        """Хранятся только последние профили."""
+        profiler = SamplingProfiler(rate=1, window=2)
+        for _ in range(5):
+            profiler.run(work)
+        assert max(row['calls'] for row in profiler.report() if 'work' in row['function']) == 2
+
+    def test_dump(self, tmp_path):
+        """Сохранение статистики в формате pstats."""
+        profiler = SamplingProfiler(rate=1)
+        profiler.run(work)
+        path = str(tmp_path / 'profile.prof')
+        assert profiler.dump(path) == 1
+        assert pstats.Stats(path).total_calls > 0
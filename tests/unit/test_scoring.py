@@ -0,0 +1,65 @@
+"""Unit tests."""
+
+import pytest
+
+from scoring import (
+    InterestsCatalog,
+    get_interests,
+    set_interests,
+)
+
+
+class DictStore(dict):
+    """Хранилище в памяти."""
+
+    def set(self, name, value, ex=None):
+        """Запись значения."""
+        self[name] = str(value)
+        return True
+
+
+class TestInterestsCatalog:
+    """Unit tests для InterestsCatalog."""
+
+    @pytest.mark.parametrize(
+        'interests', ([], ['cars'], ['pets', 'otus'], ['books', 'tv', 'cinema']), ids=['empty', 'one', 'two', 'three'],
+    )
+    def test_encode_decode(self, interests):
+        """Кодирование и декодирование хобби."""
+        catalog = InterestsCatalog()
+        assert catalog.decode(catalog.encode(interests)) == interests
+
+    def test_encode_mask(self):
+        """Бит N-1 маски соответствует ключу i:N."""
+        assert InterestsCatalog().encode(['cars', 'travel']) == 0b101
+
+    def test_encode_unknown(self):
+        """Неизвестное хобби."""
+        with pytest.raises(ValueError):
+            assert InterestsCatalog().encode(['r2d2'])
+
+    def test_decode_interned(self):
+        """Декодированные хобби не создают новых строк."""
+        catalog = InterestsCatalog()
+        assert catalog.decode(1)[0] is catalog.decode(3)[0]
+
+    def test_load(self):
+        """Загрузка справочника из БД."""
+        catalog = InterestsCatalog().load(DictStore({'i:1': 'chess', 'i:2': 'go'}))
+        assert catalog.interests == ('chess', 'go')
+        assert catalog.decode(2) == ['go']
+
+
+class TestGetInterests:
+    """Unit tests для get_interests."""
+
+    def test_set_get(self):
+        """Запись и чтение хобби клиента."""
+        store = DictStore()
+        set_interests(store, 1, ['sport', 'music'])
+        assert store['ci:1'] == str(0b110000)
+        assert get_interests(store, 1) == ['sport', 'music']
+
+    def test_missing(self):
+        """Хобби клиента отсутствуют в БД."""
+        assert get_interests(DictStore(), 2) == []
@@ -0,0 +1,105 @@
+"""Unit tests."""
+
+import json
+import os
+import socket
+import stat
+import time
+from socketserver import StreamRequestHandler
+from threading import Thread
+
+import pytest
+
+import constants
+from api import MainHTTPHandler
+from replay import UnixHTTPConnection
+from server import make_server
+
+
+class TestUnixSocketServer:
+    """Unit tests для сервера на Unix domain socket."""
+
+    @pytest.mark.parametrize('threaded', (False, True), ids=['single', 'threaded'])
+    def test_request(self, threaded, tmp_path):
+        """Запрос через Unix domain socket."""
+        path = str(tmp_path / 'api.sock')
+        server = make_server(path, MainHTTPHandler, threaded=threaded, socket_mode=0o600)
+        thread = Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+            connection = UnixHTTPConnection(path)
+            connection.request('POST', '/method/', json.dumps({'login': 'c3po', 'method': 'online_score'}))
+            response = json.load(connection.getresponse())
+            connection.close()
+        finally:
+            server.shutdown()
+            thread.join()
+            server.server_close()
+        assert response.get('code') == constants.INVALID_REQUEST
+        assert not os.path.exists(path)
+
+    def test_stale_socket(self, tmp_path):
+        """Удаление сокета остановленного сервера."""
+        path = str(tmp_path / 'api.sock')
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        server = make_server(path, MainHTTPHandler)
+        try:
+            assert server.server_address == path
+            assert stat.S_ISSOCK(os.stat(path).st_mode)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(path)
+        finally:
+            server.server_close()
+
+    def test_not_socket(self, tmp_path):
+        """Файл по пути сокета не является сокетом."""
+        path = tmp_path / 'api.sock'
+        path.write_text('data')
+        with pytest.raises(FileExistsError):
+            make_server(str(path), MainHTTPHandler)
+        assert path.read_text() == 'data'
+
+    def test_socket_in_use(self, tmp_path):
+        """Сокет используется другим сервером."""
+        path = str(tmp_path / 'api.sock')
+        server = make_server(path, MainHTTPHandler)
+        try:
+            with pytest.raises(OSError):
+                make_server(path, MainHTTPHandler)
+        finally:
+            server.server_close()
+
+
+class TestWorkerPoolServer:
+    """Unit tests для сервера с пулом потоков."""
+
+    def test_queue_delay(self):
+        """Время ожидания соединения в очереди пула."""
+        delays = []
+
+        class SlowHandler(StreamRequestHandler):
+            """Медленный обработчик."""
+
+            def handle(self):
+                """Обработка соединения."""
+                delays.append(self.server.queue_delay(self.request))
+                time.sleep(0.2)
+                self.wfile.write(b'ok')
+
+        server = make_server(('localhost', 0), SlowHandler, threaded=True, workers=1)
+        thread = Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            clients = [socket.create_connection(server.server_address) for _ in range(2)]
+            for client in clients:
+                assert client.recv(2) == b'ok'
+                client.close()
+        finally:
+            server.shutdown()
+            thread.join()
+            server.server_close()
+        assert delays[0] < 0.1
+        assert delays[1] > 0.1
@@ -0,0 +1,147 @@
+"""Unit tests."""
+
+import datetime
+
+import pytest
+
+import api
+import snapshots
+from snapshots import (
+    SnapshotCache,
+    SnapshotJob,
+    build_snapshot,
+    get_snapshot_interests,
+    snapshot_key,
+)
+
+DATE = datetime.date(2017, 7, 20)
+NOW = datetime.datetime(2017, 7, 20, 23, 59)
+
+
+class SnapshotStore:
+    """Хранилище снимков в памяти."""
+
+    def __init__(self, interests):
+        """Метод init."""
+        self.values = interests
+        self.hashes = {}
+        self.locks = set()
+        self.reads = 0
+        self.checks = 0
+
+    def get(self, key):
+        """Получение значения."""
+        return self.values.get(key)
+
+    def scan_values(self, match):
+        """Получение значений по шаблону."""
+        return {key: value for key, value in self.values.items() if key.startswith(match.rstrip('*'))}
+
+    def save_snapshot(self, name, mapping, ex):
+        """Запись хэша."""
+        self.hashes[name] = dict(mapping)
+
+    def lock(self, name, ex):
+        """Захват блокировки."""
+        if name in self.locks:
+            return False
+        self.locks.add(name)
+        return True
+
+    def exists(self, name):
+        """Проверка наличия ключа."""
+        self.checks += 1
+        return name in self.hashes
+
+    def hget(self, name, key):
+        """Получение поля хэша."""
+        self.reads += 1
+        return self.hashes.get(name, {}).get(str(key))
+
+
+class TestSnapshots:
+    """Unit tests для снимков хобби."""
+
+    @pytest.fixture(autouse=True)
+    def cache(self, monkeypatch):
+        """Пустой кэш снимков."""
+        monkeypatch.setattr(snapshots, 'SNAPSHOTS', SnapshotCache())
+
+    def test_build(self):
+        """Создание снимка."""
+        store = SnapshotStore({'ci:1': '3', 'ci:2': '16', 'i:1': 'cars'})
+        assert build_snapshot(store, DATE, today=DATE) == 2
+        assert store.hashes[snapshot_key(DATE)] == {'1': '3', '2': '16'}
+
+    @pytest.mark.parametrize(
+        'date', (DATE - datetime.timedelta(days=1), DATE + datetime.timedelta(days=1)), ids=['past', 'future'],
+    )
+    def test_build_refused(self, date):
+        """Снимок создается только на текущий день."""
+        store = SnapshotStore({'ci:1': '3'})
+        with pytest.raises(ValueError):
+            build_snapshot(store, date, today=DATE)
+        assert store.hashes == {}
+
+    def test_snapshot_interests(self):
+        """Снимок не меняется вместе с текущими данными и кэшируется."""
+        store = SnapshotStore({'ci:1': '3'})
+        build_snapshot(store, DATE, today=DATE)
+        store.values['ci:1'] = '16'
+        assert get_snapshot_interests(store, 1, DATE) == ['cars', 'pets']
+        assert get_snapshot_interests(store, 1, DATE) == ['cars', 'pets']
+        assert get_snapshot_interests(store, 2, DATE) == []
+        assert get_snapshot_interests(store, 2, DATE) == []
+        assert store.reads == 2
+
+    def test_missing_snapshot(self, caplog):
+        """Отсутствие снимка на дату записывается в лог и кэшируется."""
+        store = SnapshotStore({})
+        date = DATE - datetime.timedelta(days=1)
+        assert get_snapshot_interests(store, 1, date) is None
+        assert get_snapshot_interests(store, 2, date) is None
+        assert store.checks == 1
+        assert store.reads == 0
+        assert [record.levelname for record in caplog.records] == ['ERROR']
+
+    @pytest.mark.parametrize('enabled', (True, False), ids=['enabled', 'disabled'])
+    def test_fallback(self, enabled, monkeypatch):
+        """Текущие хобби, если снимки выключены или снимка на дату нет."""
+        monkeypatch.setattr(api, 'use_snapshots', enabled)
+        store = SnapshotStore({'ci:1': '3'})
+        build_snapshot(store, DATE, today=DATE)
+        store.values['ci:1'] = '16'
+        expected = ['cars', 'pets'] if enabled else ['sport']
+        assert api.get_client_interests(store, 1, DATE) == expected
+        assert api.get_client_interests(store, 1, DATE - datetime.timedelta(days=2)) == ['sport']
+
+    def test_job(self):
+        """Фоновое обновление снимка на сегодня одним процессом за интервал."""
+        store = SnapshotStore({'ci:1': '3'})
+        assert SnapshotJob(store).run_once(NOW)
+        store.values['ci:1'] = '16'
+        assert not SnapshotJob(store).run_once(NOW)
+        assert store.hashes[snapshot_key(DATE)] == {'1': '3'}
+        store.locks.clear()
+        assert SnapshotJob(store).run_once(NOW)
+        assert store.hashes[snapshot_key(DATE)] == {'1': '16'}
+
+
+class TestSnapshotCache:
+    """Unit tests для SnapshotCache."""
+
+    def test_ttl(self):
+        """Истечение времени жизни."""
+        cache = SnapshotCache(ttl=-1)
+        cache.set('key', 'value')
+        assert cache.get('key') is None
+
+    def test_max_size(self):
+        """Вытеснение давно использованных значений."""
+        cache = SnapshotCache(max_size=2)
+        cache.set(1, 'a')
+        cache.set(2, 'b')
+        cache.get(1)
+        cache.set(3, 'c')
+        assert cache.get(2) is None
+        assert cache.get(1) == 'a'
@@ -0,0 +1,69 @@
+"""Unit tests."""
+
+import json
+import time
+
+import pytest
+
+from tracing import (
+    Tracer,
+    span,
+    tag,
+    traced,
+)
+
+
+@traced('storage.get')
+def slow_get(delay):
+    """Медленное чтение."""
+    time.sleep(delay)
+    return delay
+
+
+class TestTracer:
+    """Unit tests для Tracer."""
+
+    def read(self, path):
+        """Записанные трассы."""
+        with open(path, encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_slow_request(self, tmp_path):
+        """Трасса медленного запроса записывается."""
+        path = str(tmp_path / 'trace.jsonl')
+        tracer = Tracer(path, slow=0.01)
+        trace = tracer.start('r2d2')
+        tag(account='c3po')
+        with span('scoring', nclients=2):
+            slow_get(0.02)
+        assert tracer.finish(trace, 200)
+        tracer.close()
+        record, = self.read(path)
+        assert record['request_id'] == 'r2d2'
+        assert record['tags'] == {'account': 'c3po'}
+        assert [item['name'] for item in record['spans']] == ['storage.get', 'scoring']
+        assert record['spans'][1]['nclients'] == 2
+
+    @pytest.mark.parametrize(
+        'code, kept', ((200, False), (422, False), (503, False), (500, True)), ids=['ok', 'invalid', 'shed', 'error'],
+    )
+    def test_tail_sampling(self, code, kept, tmp_path):
+        """Трассы быстрых успешных и отклоненных при перегрузке запросов не записываются."""
+        tracer = Tracer(str(tmp_path / 'trace.jsonl'), slow=10)
+        assert tracer.finish(tracer.start('r2d2'), code) is kept
+        tracer.close()
+
+    def test_span_error(self, tmp_path):
+        """Ошибка участка трассы."""
+        tracer = Tracer(str(tmp_path / 'trace.jsonl'), slow=0)
+        trace = tracer.start('r2d2')
+        with pytest.raises(ValueError):
+            with span('validation'):
+                raise ValueError('Ошибка валидации полей')
+        tracer.finish(trace, 422)
+        tracer.close()
+        assert trace.spans[0]['error'] == 'ValueError: Ошибка валидации полей'
+
+    def test_no_trace(self):
+        """Без трассы участки не записываются."""
+        assert slow_get(0) == 0
@@ -0,0 +1,63 @@
+"""Unit tests."""
+
+import threading
+
+from requests import (
+    MethodRequest,
+    OnlineScoreRequest,
+)
+from storage import Storage
+from warmup import (
+    start_warmup,
+    warmup,
+)
+
+
+class WarmupStore(dict):
+    """Хранилище в памяти с пулом соединений."""
+
+    connections = 0
+
+    def connect(self, count=1):
+        """Открытие соединений пула."""
+        self.connections += count
+        return count
+
+
+class TestWarmup:
+    """Unit tests для прогрева."""
+
+    def test_schema(self):
+        """Поля запроса определяются один раз для класса."""
+        warmup()
+        assert OnlineScoreRequest().fields is OnlineScoreRequest().fields
+        assert MethodRequest().fields == ['account', 'login', 'token', 'arguments', 'method']
+
+    def test_store(self):
+        """Открытие соединений с БД."""
+        store = WarmupStore()
+        warmup(store, connections=5)
+        assert store.connections == 5
+
+    def test_ready(self):
+        """Готовность после прогрева."""
+        ready = threading.Event()
+        start_warmup(ready, WarmupStore()).join()
+        assert ready.is_set()
+
+    def test_storage_client(self):
+        """Один клиент Redis при одновременном первом обращении из прогрева и запросов."""
+        storage = Storage(host='localhost', port=6379, socket_timeout=1)
+        barrier = threading.Barrier(10)
+        clients = []
+
+        def client():
+            barrier.wait()
+            clients.append(storage._r)
+
+        threads = [threading.Thread(target=client) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len({id(item) for item in clients}) == 1
@@ -0,0 +1,63 @@
+"""Unit tests."""
+
+import threading
+import time
+
+import pytest
+
+from writebehind import WriteBehindQueue
+
+
+class ListStore:
+    """Хранилище списков в памяти."""
+
+    def __init__(self, delay=0):
+        """Метод init."""
+        self.delay = delay
+        self.batches = []
+        self.started = threading.Event()
+
+    def push_many(self, items):
+        """Пакетная запись."""
+        self.started.set()
+        time.sleep(self.delay)
+        self.batches.append(list(items))
+
+
+class TestWriteBehindQueue:
+    """Unit tests для WriteBehindQueue."""
+
+    def test_batch_size(self):
+        """Запись пакетами по размеру."""
+        store = ListStore()
+        writer = WriteBehindQueue(store, batch_size=2, flush_interval=10)
+        for number in range(5):
+            writer.put('sh:c3po', number)
+        writer.close()
+        assert [len(batch) for batch in store.batches] == [2, 2, 1]
+
+    def test_flush_interval(self):
+        """Запись пакета по времени."""
+        store = ListStore()
+        writer = WriteBehindQueue(store, batch_size=100, flush_interval=0.05)
+        writer.put('sh:c3po', 1)
+        time.sleep(0.3)
+        assert store.batches == [[('sh:c3po', 1)]]
+        writer.close()
+
+    def test_drop(self):
+        """Отбрасывание записей при заполнении очереди."""
+        store = ListStore(delay=0.2)
+        writer = WriteBehindQueue(store, max_size=1, batch_size=1, flush_interval=0)
+        writer.put('sh:c3po', 1)
+        store.started.wait()
+        assert writer.put('sh:c3po', 2)
+        assert not writer.put('sh:c3po', 3)
+        writer.close()
+        assert writer.dropped == 1
+        assert store.batches == [[('sh:c3po', 1)], [('sh:c3po', 2)]]
+
+    def test_unknown_policy(self):
+        """Неизвестная политика заполнения очереди."""
+        with pytest.raises(ValueError):
+            WriteBehindQueue(ListStore(), policy='r2d2')
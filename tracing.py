@@ -0,0 +1,111 @@
+"""Трассировка запросов."""
+
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from constants import (
+    INTERNAL_ERROR,
+    SERVICE_UNAVAILABLE,
+)
+
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+
+class Trace:
+    """Трасса запроса."""
+
+    def __init__(self, request_id):
+        """Метод init."""
+        self.request_id = request_id
+        self.timestamp = time.time()
+        self.started = time.monotonic()
+        self.tags = {}
+        self.spans = []
+        self.token = None
+
+
+@contextmanager
+def span(name, **tags):
+    """Участок трассы текущего запроса."""
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.monotonic()
+    record = {'name': name, 'start': started - trace.started}
+    record.update(tags)
+    try:
+        yield
+    except Exception as e:
+        record['error'] = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        record['duration'] = time.monotonic() - started
+        trace.spans.append(record)
+
+
+def traced(name):
+    """Трассировка вызовов функции."""
+    def my_decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return my_decorator
+
+
+def tag(**tags):
+    """Добавление меток в трассу текущего запроса."""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.tags.update(tags)
+
+
+class Tracer:
+    """Запись в JSONL трасс только медленных (не быстрее slow секунд) или завершившихся ошибкой сервера запросов.
+
+    Быстрые ответы 503 (отклоненные при перегрузке запросы) не записываются.
+    """
+
+    def __init__(self, path, slow=0.5):
+        """Метод init."""
+        self.path = path
+        self.slow = slow
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def start(self, request_id):
+        """Начало трассы запроса."""
+        trace = Trace(request_id)
+        trace.token = current_trace.set(trace)
+        return trace
+
+    def finish(self, trace, code):
+        """Завершение трассы запроса и запись при необходимости."""
+        current_trace.reset(trace.token)
+        duration = time.monotonic() - trace.started
+        if duration < self.slow and (code < INTERNAL_ERROR or code == SERVICE_UNAVAILABLE):
+            return False
+        record = {
+            'request_id': trace.request_id,
+            'ts': trace.timestamp,
+            'duration': duration,
+            'code': code,
+            'tags': trace.tags,
+            'spans': trace.spans,
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+        return True
+
+    def close(self):
+        """Закрытие файла."""
+        with self._lock:
+            self._file.close()
@@ -139,3 +139,15 @@ class ClientIDsField(Field):
         if not all_is_int:
             raise ValueError('Перечень клиентов должен содержать только цифры (id)')
         return True
+
+
+class RateField(Field):
+    """Тип данных - доля от 0 до 1."""
+
+    _type = (int, float)
+
+    def validate(self, value):
+        """Валидация."""
+        if isinstance(value, bool) or not 0 <= value <= 1:
+            raise ValueError('Доля должна быть числом от 0 до 1')
+        return True
@@ -0,0 +1,39 @@
+"""Прогрев сервера перед обслуживанием запросов."""
+
+import datetime
+import logging
+import threading
+import time
+
+from requests import ApiRequest
+from scoring import get_catalog
+
+
+def warmup(store=None, connections=10):
+    """Подготовка схем запросов, соединений с БД и справочника хобби."""
+    started = time.monotonic()
+    for request_class in ApiRequest.__subclasses__():
+        request_class.schema()
+    datetime.datetime.strptime('01.01.2000', '%d.%m.%Y')
+    if store is not None:
+        store.connect(connections)
+        get_catalog(store)
+    logging.info(f'Прогрев завершен за {time.monotonic() - started:.3f} с')
+
+
+def start_warmup(ready, store=None, connections=10, interval=1):
+    """Фоновый прогрев с повтором при ошибке, по завершении устанавливается событие ready."""
+    def run():
+        while True:
+            try:
+                warmup(store, connections)
+            except Exception as e:
+                logging.error(f'Ошибка прогрева: {e}')
+                time.sleep(interval)
+            else:
+                ready.set()
+                return
+
+    thread = threading.Thread(target=run, name='warmup', daemon=True)
+    thread.start()
+    return thread
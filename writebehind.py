@@ -0,0 +1,70 @@
+"""Отложенная фоновая запись в хранилище."""
+
+import logging
+import queue
+import threading
+import time
+
+STOP = object()
+
+
+class WriteBehindQueue:
+    """Фоновая запись значений в списки хранилища пакетами по размеру или времени.
+
+    Очередь ограничена max_size записями, при заполнении политика policy
+    "drop" отбрасывает новую запись, "block" ожидает освобождения места.
+    """
+
+    def __init__(self, store, max_size=10000, batch_size=100, flush_interval=1, policy='drop'):
+        """Метод init."""
+        if policy not in ('drop', 'block'):
+            raise ValueError(f'Неизвестная политика "{policy}"')
+        self._store = store
+        self._queue = queue.Queue(maxsize=max_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    def put(self, name, value):
+        """Добавление записи в очередь."""
+        try:
+            self._queue.put((name, value), block=self.policy == 'block')
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logging.error(f'Очередь записи заполнена, запись в "{name}" отброшена')
+            return False
+
+    def close(self):
+        """Запись оставшихся значений и остановка."""
+        self._queue.put(STOP)
+        self._thread.join()
+
+    def _run(self):
+        """Фоновая запись, пакет записывается не позже flush_interval после первого значения."""
+        item = self._queue.get()
+        while item is not STOP:
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    item = None
+                    break
+                if item is STOP:
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if item is not STOP:
+                item = self._queue.get()
+
+    def _flush(self, batch):
+        """Запись пакета в хранилище."""
+        try:
+            self._store.push_many(batch)
+        except Exception as e:
+            logging.error(f'Не удалось записать {len(batch)} значений: {e}')